@@ -1,3 +1,5 @@
+import re
+
 from setuptools import setup
 
 KEYWORDS = ['unittest', 'testing', 'tests']
@@ -16,9 +18,16 @@ CLASSIFIERS = [
     'Topic :: Software Development :: Libraries :: Python Modules',
     'Topic :: Software Development :: Testing',
 ]
+
+
+def _read_version():
+    with open('src/nose2_contrib/jira/_version.py', encoding='utf-8') as version_file:
+        return re.search(r"__version__\s*=\s*['\"]([^'\"]+)['\"]", version_file.read()).group(1)
+
+
 setup(
     name='nose2-jira-plugin',
-    version=open('src/nose2_contrib/jira/_version.py').readlines()[-1].split()[-1].strip('"\''),
+    version=_read_version(),
     packages=['nose2_contrib', 'nose2_contrib.jira'],
     package_dir={'': 'src'},
     url='https://github.com/artragis/nose2-jira-plugin',
@@ -13,10 +13,39 @@ notifying a regression (i.e an issue marked as solved but that we met again).
 A basic callback take three parameters : ``jira_plugin``, ``jira_issue``, ``test`` and  ``message``. If you want to add
 other parameters, you have to use keyword arguments.
 
+Callbacks are only dispatched while ``jira_plugin.connected`` is ``True``, so they do not need to check the connection
+themselves.
+
+The issue statuses are cached for the whole test run. A callback that changes the status of an issue must call
+``jira_plugin.forget_issue(jira_issue)`` so that the next outcomes see the new status, as ``apply_jira_transition``
+does.
+
 To add your own callback to the registry add them to your main file and decorate them with
 ``@JiraRegistry.register(name, override_existing)``
 """
-from nose2_contrib.jira.jira_plugin import JiraRegistry
+import re
+from functools import partial, update_wrapper
+from string import Formatter
+
+from nose2_contrib.jira.jira_plugin import JiraRegistry, JiraRegression
+
+_MESSAGE_FORMAT_KEYS = {'test', 'message'}
+
+
+def _check_message_format(message_format):
+    """
+    Parse the message format once, at registration time, so that an unknown key is reported immediately instead of
+    failing in a reporting thread for every test.
+
+    :param message_format: the message format, ``None`` to skip the check
+    :raise ValueError: if the format is malformed or uses other keys than ``test`` and ``message``
+    """
+    if message_format is None:
+        return
+    for _, field_name, _, _ in Formatter().parse(message_format):
+        if field_name is not None and re.split(r'[.\[]', field_name, maxsplit=1)[0] not in _MESSAGE_FORMAT_KEYS:
+            raise ValueError('{!r} is not an accepted key in {!r}, use test or message.'.format(
+                field_name, message_format))
 
 
 def add_comment(jira_plugin, jira_issue, test, message, *, message_format):
@@ -29,14 +58,8 @@ def add_comment(jira_plugin, jira_issue, test, message, *, message_format):
     :param message_format: the message format. As of 1.0 we use ``str.format`` syntax and accepted keys are ``test``
     and ``message``
     """
-    if not jira_plugin.connected:
-        return
     jira_plugin.jira_client.add_comment(jira_issue, message_format.format(test=test, message=message))
-    jira_plugin.logger.info("Comment sent to %(jira_issue_id)s for %(test)s",
-                            extra=dict(jira_issue_id=jira_issue.id, test=test))
-
-JiraRegistry.register('write_success_comment', False,
-                      message_format="{test} has successed.")(add_comment)
+    jira_plugin.logger.info("Comment sent to %s for %s", jira_issue.id, test)
 
 
 def apply_jira_transition(jira_plugin, jira_issue, test, message, *, jira_transition, message_format):
@@ -51,15 +74,14 @@ def apply_jira_transition(jira_plugin, jira_issue, test, message, *, jira_transi
     :param message_format: the transition message format. As of 1.0 we use ``str.format`` syntax and accepted keys are
     ``test`` and ``message``. To bypass "transition message submission" give ``None``
     """
-    if not jira_plugin.connected:
-        return
     if message_format:
         add_comment(jira_plugin, jira_issue, test, message, message_format=message_format)
     transition_id = jira_plugin.jira_client.find_transitionid_by_name(jira_issue, jira_transition)
     jira_plugin.jira_client.transition_issue(jira_issue, transition_id)
+    jira_plugin.forget_issue(jira_issue)
 
 
-def register_transition(registration_name, jira_transition, transition_message_format):
+def register_transition(registration_name, jira_transition, transition_message_format, override_existing=False):
     """
     register a transition you want to apply on test run.
     Example, To send back a ticket to development you can probably use
@@ -77,13 +99,16 @@ def register_transition(registration_name, jira_transition, transition_message_f
     :param jira_transition: The transition to apply
     :param transition_message_format: the transition message format. As of 1.0 we use ``str.format`` syntax and
     accepted keys are ``test`` and ``message``
+    :param override_existing: if ``True`` this will overrides any callback mapped to ``registration_name``. If \
+    ``False`` the method rises ``ValueError`` if ``registration_name`` already exists.
     :return: the registered callback
+    :raise ValueError: if ``transition_message_format`` uses other keys than ``test`` and ``message``
     """
-    return JiraRegistry.register(registration_name, True, jira_transition=jira_transition,
+    _check_message_format(transition_message_format)
+    return JiraRegistry.register(registration_name, override_existing, jira_transition=jira_transition,
                                  message_format=transition_message_format)(apply_jira_transition)
 
 
-@JiraRegistry.register('do_nothing', False)
 def do_nothing(jira_plugin, jira_issue, test, *_):
     """
     explicitly does nothing. It logs the date. This callback is usefull for debug purpose.
@@ -91,9 +116,7 @@ def do_nothing(jira_plugin, jira_issue, test, *_):
     :param jira_issue: the jira issue object
     :param test: the test case
     """
-    jira_plugin.logger.info("did nothing for %(jira_issue)s and test %(test)s", extra={
-        'jira_issue': jira_issue.id, 'test': test
-    })
+    jira_plugin.logger.info("did nothing for %s and test %s", jira_issue.id, test)
 
 
 def warn_regression(jira_plugin, jira_issue, test, message, *, message_format):
@@ -111,13 +134,17 @@ def warn_regression(jira_plugin, jira_issue, test, message, *, message_format):
     :param message_format: the message format. As of 1.0 we use ``str.format`` syntax and accepted keys are ``test``
     and ``message``
     """
-    from nose2_contrib.jira.jira_plugin import JiraRegression
-    if not jira_plugin.connected:
-        return
-
     jira_plugin.jira_client.add_comment(jira_issue, message_format.format(test=test, message=message))
     jira_plugin.regressions.append(JiraRegression(jira_issue.id, test, message))
 
 
-JiraRegistry.register('warn_regression', False, message_format="Automated tests {test} found regression. Details :"
-                                                               "{message}")(warn_regression)
+# built-in callbacks are seeded in one go, callbacks registered beforehand take precedence over them
+_builtin_callbacks = {
+    'write_success_comment': update_wrapper(partial(add_comment, message_format="{test} has successed."), add_comment),
+    'do_nothing': do_nothing,
+    'warn_regression': update_wrapper(partial(warn_regression,
+                                              message_format="Automated tests {test} found regression. Details :"
+                                                             "{message}"), warn_regression),
+}
+_builtin_callbacks.update(JiraRegistry.registry)
+JiraRegistry.registry = _builtin_callbacks
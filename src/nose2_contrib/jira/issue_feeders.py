@@ -1,30 +1,40 @@
+import functools
+import re
+
+
 class JiraKnownIssueException(Exception):
     def __init__(self, issue, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.issue = issue
 
 
+@functools.lru_cache(maxsize=32)
+def _compile_mnemonics(mnemonics):
+    """
+    Build the regular expression matching any issue key of the given mnemonics. A key must start on a word boundary so
+    that the ``IR`` mnemonic does not match ``JIR-42``.
+
+    :param mnemonics: tuple of acceptable mnemonics
+    :type mnemonics: tuple[str]
+    :return: the compiled pattern
+    """
+    return re.compile(r'\b(?:' + '|'.join(re.escape(mnemonic) for mnemonic in mnemonics) + r')-\d+')
+
+
 def feed_from_string(mnemonics, *, description, **_):
     """
     Iter through string such as test docstring and extract all included jira issues.
 
-    :param mnemonics: list of acceptable mnemonics
+    :param mnemonics: list of acceptable mnemonics, give a ``tuple`` to avoid a copy on each call
     :type mnemonics: iterable[str]
     :param description: string with extractable jira issues
     :return: iterable[str]
     """
-    for mnemonic in mnemonics:
-        if mnemonic + "-" in description:
-            issue_key = mnemonic + '-'
-            start_index = description.index(mnemonic) + len(mnemonic + '-')
-            for i, current_char in enumerate(description[start_index:]):
-                if not current_char.isdigit():
-                    for other_issue in feed_from_string(mnemonics, description=description[start_index + i:]):
-                        yield other_issue
-                    break
-                issue_key += current_char
-            if issue_key[-1].isdigit():
-                yield issue_key
+    mnemonics = tuple(mnemonics)
+    if not mnemonics or not description:
+        return
+    # the pattern has no capturing group, so findall directly gives the whole keys without building match objects
+    yield from _compile_mnemonics(mnemonics).findall(description)
 
 
 def feed_from_exec_info(mnemonics, *, exec_info, **_):
@@ -38,5 +48,7 @@ def feed_from_exec_info(mnemonics, *, exec_info, **_):
     """
     if exec_info and isinstance(exec_info, (list, tuple)) and len(exec_info) > 1:
         exception = exec_info[1]  # exception instance
-        for issue_key in feed_from_string(mnemonics, description=getattr(exception, 'issue', '')):
-            yield issue_key
+        issue = getattr(exception, 'issue', None)
+        if not issue:
+            return
+        yield from feed_from_string(mnemonics, description=issue)
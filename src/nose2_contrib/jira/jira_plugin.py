@@ -1,6 +1,7 @@
 """
 This plugin connects to your jira bugtracker. Once a test outcomes a result, it tries to find out a jira issue.
-If it's found, it takes advantage of ``asyncio`` facility to dial with Jira.
+If it's found, it hands the issue over to a pool of reporting threads that dial with Jira, so that the test run is
+never blocked by network calls.
 
 .. mermaid::
 
@@ -8,7 +9,7 @@ If it's found, it takes advantage of ``asyncio`` facility to dial with Jira.
         participant runner
         participant testcase
         participant jira plugin
-        participant event loop
+        participant reporting threads
         participant jira server
         runner->jira plugin: Instanciate
         loop test run
@@ -16,34 +17,71 @@ If it's found, it takes advantage of ``asyncio`` facility to dial with Jira.
             testcase->runner: outcome result
             runner->jira plugin: here is the result
             jira plugin->testcase: give me your associated jira issue
-            jira plugin-->event loop: process action on jira server
-            event loo --> jira server: start dialing
+            jira plugin-->reporting threads: process action on jira server
+            reporting threads-->jira server: fetch issue status and apply callback
         end
         runner->jira plugin: test run has ended
-        jira plugin->event loop: finish all working report
+        jira plugin->reporting threads: finish all working report
 
 """
-import concurrent
-import contextlib
-import copy
-import json
 import logging
 import os
 from urllib.error import HTTPError
-from collections import namedtuple
+from collections import OrderedDict, deque, namedtuple
 from concurrent.futures.thread import ThreadPoolExecutor
-from functools import wraps
-from textwrap import dedent
+from functools import partial, update_wrapper
+from sys import intern
+from textwrap import dedent, indent
+from threading import BoundedSemaphore
 
-import sys
 from nose2.util import format_traceback
 import itertools
 from jira import JIRA
+from jira.exceptions import JIRAError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
 from pathlib import Path
 from nose2.result import FAIL, ERROR, PASS
 from nose2.events import Plugin
 from nose2_contrib.jira.issue_feeders import feed_from_string, feed_from_exec_info
 
+_MISSING = object()
+MAX_REPORTING_THREADS = 64
+# jira wiki code blocks are written as {code}
+_OUTCOME_MESSAGE_TEMPLATE = """
+        execution information : 
+        {{code}}
+        {exc_info}
+        {{code}}
+        stack trace 
+        {{code}}
+        {traceback}
+        {{code}}
+        
+        """
+# regression report templates are dedented once, only the formatting is done per regression
+_MD_REGRESSION_TEMPLATE = dedent("""
+    # {issue}
+
+    Regression was found by `{test}`. Debug info are : 
+
+    ```
+    {message}
+    ```
+
+    """)
+_RST_REGRESSION_TEMPLATE = dedent("""
+    {issue}
+    {issue_title_line}
+
+    Regression was found by `{test}`. Debug info are : 
+
+    .. sourcecode::
+
+    {message}
+
+    """)
+
 
 class JiraAndResultAssociation(namedtuple('JiraAndResultAssociation', ['jira_status', 'test_result'])):
     """
@@ -53,6 +91,17 @@ class JiraAndResultAssociation(namedtuple('JiraAndResultAssociation', ['jira_sta
 
     To associate a "*NOOP*" action with statuses just use `do_nothing` as callback to say it explicitely or just
     do not create an association
+
+    Being a ``namedtuple``, an association is equal to the plain ``(jira_status, test_result)`` tuple, so both can be
+    used to look up a callback.
+    """
+
+    __slots__ = ()
+
+
+class JiraConfigurationError(ValueError):
+    """
+    Raised when the plugin starts with an invalid ``[jira]`` configuration section.
     """
 
 
@@ -61,6 +110,8 @@ class JiraRegression(namedtuple('JiraRegression', ['issue_id', 'test', 'failure_
     Represents a regression as found by the plugin. This allows to dump messages about regressions into md file.
     """
 
+    __slots__ = ()
+
 
 class JiraMappingPlugin(Plugin):
     """
@@ -68,6 +119,16 @@ class JiraMappingPlugin(Plugin):
 
         a list of regressions (i.e the issues that the test run found and were already marked as fixed).
 
+    .. attribute:: issues
+
+        the jira issues already fetched during the test run, by key.
+
+    .. attribute:: reporting_threads
+
+        the number of threads that send reports to jira, the jira connection pool has the same size by default.
+        Threads are started lazily, at most one per submitted batch and never more than ``reporting_threads``. They
+        mostly wait on the jira sockets, which releases the GIL for the test run.
+
     .. attribute:: jira_client
 
         the active jira connection
@@ -76,6 +137,11 @@ class JiraMappingPlugin(Plugin):
 
         if ``True`` marks the ``jira_client`` as currently active.
 
+    .. attribute:: reported_outcomes
+
+        the test outcomes that have at least one callback other than ``do_nothing``. Tests with an other outcome are \
+        not looked up in jira at all.
+
     .. attribute:: default_jira_status
 
         alias that will gather all jira statuses that you don't want to explicitly define. It defaults as \
@@ -96,75 +162,107 @@ class JiraMappingPlugin(Plugin):
     configSection = 'jira'
     alwaysOn = True
     connected = False
+    jira_client = None
 
     def __init__(self):
         jira_server = self.config.as_str("server", "https://jira.com")
         jira_auth_method = self.config.as_str("auth", "basic")
         self.logger = logging.getLogger(__name__)
-        with contextlib.suppress(ValueError, HTTPError, AttributeError):
-            # AttributeError is needed for 3.4 compatibility
-            if jira_auth_method.lower().strip() == "basic":
-                auth_tuple = (self.config.as_str("user", "user"), self.config.as_str("password", "password"))
-                self._connect(jira_server, basic_tuple=auth_tuple)
-            else:
-                cert_key_path = Path(self.config.as_str("key_file", "cert.key"))
-                try:
-                    with cert_key_path.open(encoding="utf-8") as f:
-                        key_value = f.read()
-                except OSError:
-                    key_value = ""
-
-                auth_dict = {
-
-                    'access_token': self.config.as_str("oauth_token", ""),
-                    'access_token_secret': self.config.as_str("oauth_secret", ""),
-                    'consumer_key': self.config.as_str("consumer_key", ""),
-                    'cert_key': key_value,
-                }
-                self._connect(jira_server, oauth_dict=auth_dict)
+        self._noop = JiraRegistry.get('do_nothing')
+        # reporting is network bound, so by default use as many threads as concurrent.futures does for I/O work
+        self.reporting_threads = self.config.as_int("reporting_threads", min(32, (os.cpu_count() or 1) + 4))
+        if self.reporting_threads > MAX_REPORTING_THREADS:
+            self.logger.warning("reporting_threads is limited to %s to avoid flooding the jira server",
+                                MAX_REPORTING_THREADS)
+            self.reporting_threads = MAX_REPORTING_THREADS
+        elif self.reporting_threads == 1:
+            self.logger.info("jira reports are sent by a single thread, raise reporting_threads to send them faster")
+        self.executor = ThreadPoolExecutor(max_workers=self.reporting_threads)
+        # bounds the batches waiting in the executor queue, flushing blocks the test run while the pool is that late
+        self._batches_in_flight = BoundedSemaphore(self.reporting_threads * 8)
+        if jira_auth_method.lower().strip() == "basic":
+            auth_tuple = (self.config.as_str("user", "user"), self.config.as_str("password", "password"))
+            self._connect(jira_server, basic_tuple=auth_tuple)
+        else:
+            cert_key_path = Path(self.config.as_str("key_file", "cert.key"))
+            try:
+                with cert_key_path.open(encoding="utf-8") as f:
+                    key_value = f.read()
+            except OSError:
+                key_value = ""
+
+            auth_dict = {
+
+                'access_token': self.config.as_str("oauth_token", ""),
+                'access_token_secret': self.config.as_str("oauth_secret", ""),
+                'consumer_key': self.config.as_str("consumer_key", ""),
+                'cert_key': key_value,
+            }
+            self._connect(jira_server, oauth_dict=auth_dict)
         status_association_list = self.config.as_list('actions', [])
         self.jira_status_result_callbacks = {}
         for status_association in status_association_list:
             try:
                 test_status, jira_status, callback_name = status_association.strip().split(',', 2)
-                callback = JiraRegistry.get(callback_name.strip(), False)
-                self.jira_status_result_callbacks[JiraAndResultAssociation(jira_status, test_status)] = callback
-            except AttributeError as e:
-                print('Action does not exist on line {}. Error detail : {}'.format(status_association, e))
-                exit(1)
-            except KeyError as e:
-                print(e)  # Key error is only for registry
-                exit(1)
             except ValueError:
-                print("Not enough argument in line {}. Expected test_status,jira_status,callback_name")
-                exit(1)
-        for association in copy.copy(self.jira_status_result_callbacks):
-            self.initialize_association(JiraAndResultAssociation(association.jira_status, PASS))
-            self.initialize_association(JiraAndResultAssociation(association.jira_status, FAIL))
-            self.initialize_association(JiraAndResultAssociation(association.jira_status, ERROR))
-        self.executor = ThreadPoolExecutor(max_workers=self.config.as_int("reporting_threads", 1))
-        self.tasks = []
-        self.mnemonics = self.config.as_list("mnemonics", [])
+                raise JiraConfigurationError("Not enough argument in line {}. Expected test_status,jira_status,"
+                                             "callback_name".format(status_association)) from None
+            callback = JiraRegistry.get(callback_name.strip(), False)
+            # the statuses are met again on every report, interned keys compare by identity when they are the same
+            self.jira_status_result_callbacks[JiraAndResultAssociation(intern(jira_status),
+                                                                       intern(test_status))] = callback
+        self.default_jira_status = intern(self.config.as_str('default_jira_status', 'In Development'))
+        configured_jira_statuses = {association.jira_status for association in self.jira_status_result_callbacks}
+        configured_jira_statuses.add(self.default_jira_status)
+        for jira_status in configured_jira_statuses:
+            for test_status in (PASS, FAIL, ERROR):
+                self.initialize_association(JiraAndResultAssociation(jira_status, test_status))
+        self.issues = {}
+        self.reporting_batch_size = max(1, self.config.as_int("reporting_batch_size", 50))
+        self._pending_reports = deque()
+        self.mnemonics = tuple(self.config.as_list("mnemonics", []))
+        if not self.mnemonics:
+            self.logger.warning("no jira mnemonics are configured, no test will be reported to jira")
         self.regressions = []
         self.regression_report_path = self.config.as_str('regression_file', 'jira_regression.md')
-        self.default_jira_status = self.config.as_str('default_jira_status', 'In Development')
-        default_passing = JiraAndResultAssociation(self.default_jira_status, PASS)
-        default_failing = JiraAndResultAssociation(self.default_jira_status, FAIL)
-        default_error = JiraAndResultAssociation(self.default_jira_status, ERROR)
-        self.initialize_association(default_failing)
-        self.initialize_association(default_passing)
-        self.initialize_association(default_error)
+        extension = os.path.splitext(self.regression_report_path)[1][1:].lower()
+        self._dump_regressions = getattr(self, 'dump_' + extension, None)
+        if self._dump_regressions is None:
+            self.logger.warning("%s is not a supported regression file format, markdown will be used", extension)
+            self._dump_regressions = self.dump_md
+        self.reported_outcomes = {association.test_result
+                                  for association, callback in self.jira_status_result_callbacks.items()
+                                  if callback is not self._noop}
+
+    def register(self):
+        """
+        register the plugin hooks, unless the plugin cannot report anything (not connected or without mnemonics), in
+        which case nose2 does not even dispatch the test events to it.
+        """
+        if not self.connected or not self.mnemonics:
+            self.logger.info("jira plugin is disabled for this run")
+            return
+        super().register()
 
     def initialize_association(self, result_association):
-        if result_association not in copy.copy(self.jira_status_result_callbacks):
-            self.jira_status_result_callbacks[result_association] = JiraRegistry.get('do_nothing')
+        self.jira_status_result_callbacks.setdefault(result_association, self._noop)
 
     def _connect(self, jira_server, basic_tuple=None, oauth_dict=None):
         try:
-            self.jira_client = JIRA(jira_server, oauth=oauth_dict, basic_auth=basic_tuple)
-        except json.decoder.JSONDecodeError:
-            sys.stderr.write('ERROR: Jira server {} is not available'.format(jira_server))
+            # the jira client session already retries connection errors and 502/503/504 with an exponential backoff
+            self.jira_client = JIRA(jira_server, oauth=oauth_dict, basic_auth=basic_tuple,
+                                    max_retries=self.config.as_int("max_retries", 3))
+        except (ValueError, HTTPError, AttributeError, RequestException, JIRAError):
+            # json.decoder.JSONDecodeError is a ValueError, AttributeError is needed for 3.4 compatibility
+            self.logger.error("Jira server %s is not available", jira_server)
+            self.jira_client = None
         else:
+            # keep alive connections are reused by all reporting threads instead of being discarded when the default
+            # pool of 10 connections is full, so there is one pooled connection per reporting thread by default
+            pool_size = self.config.as_int("http_pool_size", self.reporting_threads)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.jira_client._session.mount("https://", adapter)
+            self.jira_client._session.mount("http://", adapter)
             self.connected = True
 
     def report(self, test, status, doc, message, exec_info):
@@ -174,20 +272,173 @@ class JiraMappingPlugin(Plugin):
         :param test: the executed test
         :param status: the result status taken in PASS or FAILURE
         :param doc: the doc/description
+        :param message: the execution message, or a callable without argument that builds it. The callable is only
+        called when the test refers to a jira issue.
+        :param exec_info: the ``sys.exc_info()`` of the outcome
+        """
+        if not self._is_reportable(status, doc, exec_info):
+            return
+        jira_issue_keys = self._find_issues(doc, exec_info)
+        if jira_issue_keys:
+            self._queue_reports(jira_issue_keys, status, test, message() if callable(message) else message)
+
+    def _find_issues(self, doc, exec_info):
+        """
+        extract the jira issue keys from the test description and its exception.
+
+        :param doc: the doc/description
+        :param exec_info: the ``sys.exc_info()`` of the outcome
+        :return: the issue keys in the order they are found, a key met in both the doc and the exception comes once
+        :rtype: list[str]
+        """
+        return list(OrderedDict.fromkeys(itertools.chain(feed_from_string(self.mnemonics, description=doc),
+                                                         feed_from_exec_info(self.mnemonics, exec_info=exec_info))))
+
+    def _queue_reports(self, jira_issue_keys, status, test, message):
+        """
+        queue the reports of the test outcome, a batch is handed over to a reporting thread once it is large enough.
+
+        :param jira_issue_keys: the jira issue keys the test refers to
+        :param status: the result status taken in PASS or FAILURE
+        :param test: the executed test
+        :param message: the execution message
+        """
+        for jira_issue_key in jira_issue_keys:
+            self._pending_reports.append((jira_issue_key, status, test, message))
+        if len(self._pending_reports) >= self.reporting_batch_size:
+            self.flush_reports()
+
+    def _is_reportable(self, status, doc, exec_info):
+        """
+        tell whether a test outcome can lead to a jira report at all, so that nothing is computed for it otherwise.
+
+        :param status: the result status taken in PASS or FAILURE
+        :param doc: the doc/description
+        :param exec_info: the ``sys.exc_info()`` of the outcome
+        :rtype: bool
+        """
+        return (self.connected and bool(self.mnemonics) and status in self.reported_outcomes
+                and bool((doc and doc.strip()) or exec_info))
+
+    def flush_reports(self):
+        """
+        hand the pending reports over to a reporting thread as a single batch. This blocks while too many batches are
+        already waiting for a reporting thread.
+        """
+        if self._pending_reports:
+            batch = list(self._pending_reports)
+            self._pending_reports.clear()
+            self._batches_in_flight.acquire()
+            try:
+                future = self.executor.submit(self._report_batch, batch)
+            except Exception:
+                # the batch never reached a reporting thread (e.g. the executor is shut down), so give its slot back
+                self._batches_in_flight.release()
+                raise
+            future.add_done_callback(self._log_report)
+
+    def _log_report(self, future):
+        """
+        log the outcome of a reported batch as soon as it is done, so that no future is kept until the end of the run.
+
+        :param future: the done future of ``_report_batch``
+        :type future: concurrent.futures.Future
+        """
+        self._batches_in_flight.release()
+        try:
+            results = future.result()
+        except Exception:  # nothing else waits on this future, so the error must be logged here
+            self.logger.exception("jira report failed")
+            return
+        errors = [result for result in results if result and "error" in result]
+        if errors:
+            # a single record per batch, so that the reporting threads do not contend on the logging handlers
+            self.logger.error("%d jira report(s) failed: error=%s", len(errors), errors)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            for result in results:
+                if not (result and "error" in result):
+                    self.logger.debug("reported %s", result)
+
+    def _report_batch(self, batch):
+        """
+        fetch all the jira issues of the batch at once then apply the matching callbacks.
+
+        :param batch: list of ``(jira_issue_key, status, test, message)``
+        :return: the callback results
+        :rtype: list
+        """
+        self.fetch_issues(OrderedDict.fromkeys(jira_issue_key for jira_issue_key, *_ in batch))
+        results = []
+        for report in batch:
+            # a failing report must not prevent the other reports of the batch to be done
+            try:
+                results.append(self._report_issue(*report))
+            except Exception:
+                self.logger.exception("jira report of %s failed", report[0])
+        return results
+
+    def _report_issue(self, jira_issue_key, status, test, message):
+        """
+        fetch the jira issue status and apply the matching callback. This runs in a reporting thread so that the
+        network round trips do not block the test run.
+
+        :param jira_issue_key: the jira issue key, such as ``JIR-42``
+        :param test: the executed test
+        :param status: the result status taken in PASS or FAILURE
         :param message: the execution message
+        :return: the callback result
+        """
+        issue = self.get_issue(jira_issue_key)
+        # plain tuples are equal to, and hash like, the JiraAndResultAssociation keys without building a namedtuple
+        callback = self.jira_status_result_callbacks.get((issue.fields.status.name, status))
+        if callback is None:
+            callback = self.jira_status_result_callbacks.get((self.default_jira_status, status), self._noop)
+        return callback(self, issue, test, message)
+
+    def get_issue(self, jira_issue_key):
         """
+        get the jira issue with its status, it is only fetched from jira server the first time its key is met during
+        the test run.
 
-        if (doc and doc.strip()) or exec_info:
-            issues = itertools.chain(feed_from_string(self.mnemonics, description=doc),
-                                     feed_from_exec_info(self.mnemonics, exec_info=exec_info))
-            for jira_issue_key in issues:
+        :param jira_issue_key: the jira issue key, such as ``JIR-42``
+        :return: the jira issue object
+        :rtype: jira.resources.Issue
+        """
+        issue = self.issues.get(jira_issue_key)
+        if issue is None:
+            # concurrent threads may both fetch a missing issue, the first one stored wins
+            issue = self.issues.setdefault(jira_issue_key, self.jira_client.issue(jira_issue_key, "status"))
+        return issue
+
+    def fetch_issues(self, jira_issue_keys):
+        """
+        fetch all the issues that are not yet known with a single JQL search. If the search is rejected (for example
+        because one of the keys does not exist), the issues will be fetched one by one by ``get_issue``.
 
-                issue = self.jira_client.issue(jira_issue_key, "status")
-                type_of_report = JiraAndResultAssociation(issue.fields.status.name, status)
-                if type_of_report not in self.jira_status_result_callbacks:
-                    type_of_report = JiraAndResultAssociation(self.default_jira_status, status)
-                callback = self.jira_status_result_callbacks.get(type_of_report, JiraRegistry.get('do_nothing'))
-                self.tasks.append(self.executor.submit(callback, self, issue, test, message))
+        :param jira_issue_keys: the jira issue keys
+        :type jira_issue_keys: iterable[str]
+        """
+        missing_keys = [jira_issue_key for jira_issue_key in jira_issue_keys if jira_issue_key not in self.issues]
+        if len(missing_keys) < 2:
+            return
+        try:
+            found_issues = self.jira_client.search_issues('key in ({})'.format(','.join(missing_keys)),
+                                                          fields='status', maxResults=len(missing_keys))
+        except JIRAError as e:
+            self.logger.debug("batch fetch of %s failed: %s", missing_keys, e)
+            return
+        for issue in found_issues:
+            self.issues.setdefault(issue.key, issue)
+
+    def forget_issue(self, jira_issue):
+        """
+        drop the issue from the cache so that its status is fetched again, callbacks that change the issue status
+        must call it.
+
+        :param jira_issue: the jira issue object
+        :type jira_issue: jira.resources.Issue
+        """
+        self.issues.pop(jira_issue.key, None)
 
     def testOutcome(self, event):
         """
@@ -196,75 +447,61 @@ class JiraMappingPlugin(Plugin):
         :param event: the success event
         :type event: nose2.events.TestOutcomeEvent
         """
-        message = """
-        execution information : 
-        {open}code{close}
-        {exc_info}
-        {open}code{close}
-        stack trace 
-        {open}code{close}
-        {traceback}
-        {open}code{close}
-        
+        description = getattr(event.test, '_testMethodDoc', '') or getattr(event.test, 'id', lambda: '')()
+        # the message, and above all the traceback, is only formatted for tests that refer to a jira issue
+        self.report(event.test, event.outcome, description, partial(self._outcome_message, event), event.exc_info)
+
+    def _outcome_message(self, event):
         """
+        format the execution message of the outcome, with its traceback unless the test passed.
 
-        description = getattr(event.test, '_testMethodDoc', '') or getattr(event.test, 'id', lambda: '')()
-        exc_inf = event.exc_info[1] if event.exc_info else ''
-        _traceback = format_traceback(event.test, event.exc_info) if event.exc_info else ''
-        self.report(event.test, event.outcome, description, message.format(exc_info=exc_inf,
-                                                                           traceback=_traceback,
-                                                                           open='{', close='}'),
-                    exec_info=event.exc_info)
+        :param event: the outcome event
+        :type event: nose2.events.TestOutcomeEvent
+        :return: the execution message
+        :rtype: str
+        """
+        if event.outcome == PASS or not event.exc_info:
+            exc_inf, _traceback = '', ''
+        else:
+            exc_inf, _traceback = event.exc_info[1], format_traceback(event.test, event.exc_info)
+        return _OUTCOME_MESSAGE_TEMPLATE.format(exc_info=exc_inf, traceback=_traceback)
 
     def afterSummaryReport(self, event):
         """
-        ends the reporting to jira (blocking asyncio call).
+        ends the reporting to jira (blocking call), then releases the pooled jira connections.
 
         :param event: the report event
         :type event: nose2.events.ReportSummaryEvent
         """
-        for future in concurrent.futures.as_completed(self.tasks):
-            result = future.result()
-            if result and "error" in result:
-                logging.error("error=%s event=%s", result, event)
-            else:
-                logging.debug("reported %s", result)
+        self.flush_reports()
+        self.executor.shutdown(wait=True)
+        if self.connected:
+            self.jira_client._session.close()
         if self.regressions:
-            _, extension = os.path.splitext(self.regression_report_path)
-            extension = extension[1:]
-            getattr(self, 'dump_' + extension, self.dump_md)()
+            self._dump_regressions()
 
     def dump_md(self):
-        with Path(self.regression_report_path).open('w', encoding='utf-8') as regression_file:
-            for regression in self.regressions:
-                regression_md = dedent("""
-                # {issue}
-
-                Regression was found by `{{test}}`. Debug info are : 
-
-                ```
-                {message}
-                ```
-
-                """.format(issue=regression.issue_id, test=regression.test, message=regression.failure_message))
-                regression_file.write(regression_md)
+        self._write_regression_report(
+            _MD_REGRESSION_TEMPLATE.format(issue=regression.issue_id, test=regression.test,
+                                           message=regression.failure_message)
+            for regression in self.regressions)
 
     def dump_rst(self):
-        with Path(self.regression_report_path).open('w', encoding='utf-8') as regression_file:
-            for regression in self.regressions:
-                regression_md = dedent("""
-                {issue}
-                {issue_title_line}
+        self._write_regression_report(
+            _RST_REGRESSION_TEMPLATE.format(issue=regression.issue_id, test=regression.test,
+                                            message=indent(regression.failure_message, '    '),
+                                            issue_title_line='=' * len(regression.issue_id))
+            for regression in self.regressions)
 
-                Regression was found by `{{test}}`. Debug info are : 
-
-                .. sourcecode::
-                
-                    {message}
+    def _write_regression_report(self, sections):
+        """
+        write the whole regression report at once: the payload is handed to a single write call, whatever the number
+        of regressions.
 
-                """.format(issue=regression.issue_id, test=regression.test, message=regression.failure_message,
-                           issue_title_line='=' * len(regression.issue_id)))
-                regression_file.write(regression_md)
+        :param sections: the formatted section of each regression
+        """
+        with Path(self.regression_report_path).open('w', encoding='utf-8') as regression_file:
+            regression_file.write(''.join(sections))
 
 
 class JiraRegistry:
@@ -306,14 +543,12 @@ class JiraRegistry:
 
         :return: the registered wrapper
         """
-        if name in cls.registry and not override_existing:
+        if cls.registry.get(name, _MISSING) is not _MISSING and not override_existing:
             raise ValueError('{} is already registered, cannot override it.'.format(name))
 
         def register_wrapper(func):
-
-            @wraps(wrapped=func)
-            def real_func(jira_plugin, jira_issue, test, message):
-                return func(jira_plugin, jira_issue, test, message, **kwargs)
+            # keyword arguments are bound once here rather than re-passed on every call
+            real_func = update_wrapper(partial(func, **kwargs), func) if kwargs else func
             cls.registry[name] = real_func
             return real_func
 
@@ -321,11 +556,15 @@ class JiraRegistry:
 
     @classmethod
     def get(cls, name, raise_on_failure=True):
+        callback = cls.registry.get(name)
+        if callback is not None:
+            return callback
+        # importing callbacks seeds the built-in callbacks, the registry must be read again afterwards
         from .callbacks import do_nothing
-        if name not in cls.registry and raise_on_failure:
+        callback = cls.registry.get(name)
+        if callback is not None:
+            return callback
+        if raise_on_failure:
             raise KeyError("{} does not exist, please register it.".format(name))
-        elif name not in cls.registry:
-            print('{} is not yet registered, wrap arround "do_nothing" for now.'.format(name))
-
-            cls.register(name)(do_nothing)
-        return cls.registry[name]
+        print('{} is not yet registered, wrap arround "do_nothing" for now.'.format(name))
+        return cls.register(name)(do_nothing)
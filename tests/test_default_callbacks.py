@@ -14,6 +14,7 @@ class TestCallbacks(TestCase):
         self.jira_plugin.jira_client.find_transitionid_by_name = mock.MagicMock()
         self.jira_plugin.jira_client.find_transitionid_by_name.return_value = 1
         self.jira_plugin.jira_client.transition_issue = mock.MagicMock()
+        self.jira_plugin.forget_issue = mock.MagicMock()
         self.jira_plugin.regressions = []
         self.jira_plugin.connected = True
         self.jira_plugin.logger = logging.getLogger(__name__)
@@ -50,8 +51,19 @@ class TestCallbacks(TestCase):
             .assert_called_once_with(issue, 'Set as To Do')
         self.jira_plugin.jira_client.transition_issue\
             .assert_called_once_with(issue, 1)
+        self.jira_plugin.forget_issue.assert_called_once_with(issue)
         self.assertEqual(0, len(self.jira_plugin.regressions))
 
+    def test_register_transition_does_not_override(self):
+        self.assertRaises(ValueError, register_transition, 'warn_regression', 'Reopen', None)
+        register_transition('warn_regression_and_reopen', 'Reopen', None)
+        callback = register_transition('warn_regression_and_reopen', 'Reopen', None, override_existing=True)
+        self.assertEqual(callback, JiraRegistry.get('warn_regression_and_reopen'))
+
+    def test_register_transition_with_unknown_key(self):
+        self.assertRaises(ValueError, register_transition, 'bad_transition_format', 'Set as To Do', '{tset} failed')
+        self.assertRaises(KeyError, JiraRegistry.get, 'bad_transition_format')
+
 
 class TestRegistry(TestCase):
     def setUp(self):
@@ -80,3 +92,8 @@ class TestRegistry(TestCase):
 
         callback = add()
         self.assertEqual(callback, JiraRegistry.get(self.id()))
+
+    def test_register_with_own_format_keys(self):
+        callback = JiraRegistry.register(self.id() + '_own_keys', message_format='{test} seen on {issue}')(
+            lambda *args, message_format: message_format)
+        self.assertEqual('{test} seen on {issue}', callback())
@@ -17,6 +17,19 @@ class TestFeeders(TestCase):
         self.assertIn('JIR-42', result)
         self.assertIn('JIR-25', result)
 
+    def test_docstring_single_pass(self):
+        docstring = "ABC-1 then JIR-2, ABC in prose, ABC-3"
+        result = list(feed_from_string(('JIR', 'ABC'), description=docstring))
+        self.assertEqual(['ABC-1', 'JIR-2', 'ABC-3'], result)
+
+    def test_docstring_mnemonic_suffix(self):
+        result = list(feed_from_string(('IR',), description="JIR-42 IR-1 (IR-2)"))
+        self.assertEqual(['IR-1', 'IR-2'], result)
+
+    def test_docstring_without_mnemonics(self):
+        self.assertEqual([], list(feed_from_string((), description="-42 JIR-42")))
+        self.assertEqual([], list(feed_from_string(('JIR',), description="")))
+
     def test_exec_info_with_jira_known_issues(self):
         try:
             raise JiraKnownIssueException('JIR-42/JIRA-24/JIR-25')
@@ -1,9 +1,13 @@
+import os
+from tempfile import TemporaryDirectory
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import nose2
 import sys
+from nose2.session import Session
+from requests.exceptions import RequestException
 from nose2_contrib.jira.issue_feeders import JiraKnownIssueException
-from nose2_contrib.jira.jira_plugin import JiraMappingPlugin
+from nose2_contrib.jira.jira_plugin import JiraConfigurationError, JiraMappingPlugin, JiraRegression
 
 
 class TestPlugin(TestCase):
@@ -15,6 +19,7 @@ class TestPlugin(TestCase):
 
         self.plugin = JiraMappingPlugin()
         self.plugin.mnemonics = ['JIR']
+        self.plugin.reported_outcomes = {'passed', 'failed', 'error'}
         self.plugin.connected = True
         self.plugin.jira_client = MagicMock()
         self.plugin.jira_client.issue = MagicMock()
@@ -27,4 +32,160 @@ class TestPlugin(TestCase):
             event = nose2.events.TestOutcomeEvent(self, None, 'error',
                                                   exc_info=sys.exc_info())
         self.plugin.testOutcome(event)
-        self.assertEqual(1, len(self.plugin.tasks))
\ No newline at end of file
+        self.plugin.flush_reports()
+        self.plugin.executor.shutdown()
+        self.plugin.jira_client.issue.assert_called_once_with('JIR-42', 'status')
+
+    def test_outcome_goes_through_report(self):
+        event = nose2.events.TestOutcomeEvent(self, None, 'passed')
+        with patch.object(self.plugin, 'report') as report:
+            self.plugin.testOutcome(event)
+        test, status, doc, message, exec_info = report.call_args[0]
+        self.assertEqual((self, 'passed', None), (test, status, exec_info))
+        self.assertIn('execution information', message())
+
+    def test_invalid_action(self):
+        session = Session()
+        session.config.read_string('[jira]\nactions = failed,do_nothing\n')
+        self.assertRaises(JiraConfigurationError, JiraMappingPlugin, session=session)
+
+    def test_register_without_mnemonics(self):
+        self.plugin.session = MagicMock()
+        self.plugin.mnemonics = ()
+        self.plugin.register()
+        self.assertFalse(self.plugin.session.registerPlugin.called)
+        self.plugin.mnemonics = ('JIR',)
+        self.plugin.register()
+        self.plugin.session.registerPlugin.assert_called_once_with(self.plugin)
+
+    def test_report_duplicated_issue(self):
+        self.plugin.report(self, 'error', 'JIR-42 and JIR-42 again', 'a message',
+                           (JiraKnownIssueException, JiraKnownIssueException('JIR-42/JIR-43'), None))
+        self.assertEqual(['JIR-42', 'JIR-43'], [report[0] for report in self.plugin._pending_reports])
+
+    @patch('nose2_contrib.jira.jira_plugin.JIRA', side_effect=RequestException('unreachable'))
+    def test_connect_failure_is_logged(self, _):
+        self.plugin.connected = False
+        with self.assertLogs(self.plugin.logger, 'ERROR'):
+            self.plugin._connect('https://jira.com', basic_tuple=('user', 'password'))
+        self.assertFalse(self.plugin.connected)
+        self.assertIsNone(self.plugin.jira_client)
+
+    def test_report_when_disconnected(self):
+        self.plugin.connected = False
+        try:
+            raise JiraKnownIssueException('JIR-42')
+        except JiraKnownIssueException:
+            event = nose2.events.TestOutcomeEvent(self, None, 'error',
+                                                  exc_info=sys.exc_info())
+        self.plugin.testOutcome(event)
+        self.plugin.flush_reports()
+        self.plugin.executor.shutdown()
+        self.assertFalse(self.plugin.jira_client.issue.called)
+
+    @patch('nose2_contrib.jira.jira_plugin.format_traceback')
+    def test_outcome_without_callback_is_not_formatted(self, format_traceback):
+        self.plugin.reported_outcomes = {'passed'}
+        try:
+            raise JiraKnownIssueException('JIR-42')
+        except JiraKnownIssueException:
+            event = nose2.events.TestOutcomeEvent(self, None, 'error', exc_info=sys.exc_info())
+        self.plugin.testOutcome(event)
+        self.assertFalse(format_traceback.called)
+
+    @patch('nose2_contrib.jira.jira_plugin.format_traceback')
+    def test_outcome_without_issue_is_not_formatted(self, format_traceback):
+        try:
+            raise ValueError('JIR-42')
+        except ValueError:
+            event = nose2.events.TestOutcomeEvent(self, None, 'error', exc_info=sys.exc_info())
+        self.plugin.testOutcome(event)
+        self.assertFalse(format_traceback.called)
+        self.assertEqual(0, len(self.plugin._pending_reports))
+
+    def test_report_outcome_without_callback(self):
+        self.plugin.reported_outcomes = {'failed'}
+        self.plugin.report(self, 'passed', 'JIR-42', 'a success', None)
+        self.plugin.flush_reports()
+        self.plugin.executor.shutdown()
+        self.assertFalse(self.plugin.jira_client.issue.called)
+
+    def test_report_issue_callback(self):
+        in_review, default_status = MagicMock(), MagicMock()
+        self.plugin.jira_status_result_callbacks = {('JIR-42', 'failed'): in_review,
+                                                    (self.plugin.default_jira_status, 'failed'): default_status}
+        self.plugin._report_issue('JIR-42', 'failed', self, 'a message')
+        in_review.assert_called_once_with(self.plugin, self.plugin.get_issue('JIR-42'), self, 'a message')
+        self.plugin.jira_client.issue.return_value.fields.status.name = 'Open'
+        self.plugin._report_issue('JIR-43', 'failed', self, 'a message')
+        self.assertEqual(1, default_status.call_count)
+        self.assertEqual(1, in_review.call_count)
+
+    def test_issue_fetched_once(self):
+        first_issue = self.plugin.get_issue('JIR-42')
+        self.assertIs(first_issue, self.plugin.get_issue('JIR-42'))
+        self.plugin.jira_client.issue.assert_called_once_with('JIR-42', 'status')
+        first_issue.key = 'JIR-42'
+        self.plugin.forget_issue(first_issue)
+        self.plugin.get_issue('JIR-42')
+        self.assertEqual(2, self.plugin.jira_client.issue.call_count)
+
+    def test_report_batch(self):
+        self.plugin.reporting_batch_size = 2
+        self.plugin.jira_client.search_issues.return_value = []
+        self.plugin.report(self, 'failed', 'JIR-1', 'first', None)
+        self.plugin.report(self, 'failed', 'JIR-2', 'second', None)
+        self.plugin.executor.shutdown()
+        self.plugin.jira_client.search_issues.assert_called_once_with('key in (JIR-1,JIR-2)', fields='status',
+                                                                      maxResults=2)
+        self.assertEqual(2, self.plugin.jira_client.issue.call_count)
+
+    def test_report_batch_with_failing_callback(self):
+        failing = MagicMock(side_effect=RuntimeError('jira is down'))
+        self.plugin.jira_status_result_callbacks = {('JIR-42', 'failed'): failing}
+        with self.assertLogs(self.plugin.logger, 'ERROR'):
+            results = self.plugin._report_batch([('JIR-1', 'failed', self, 'first'),
+                                                 ('JIR-2', 'failed', self, 'second')])
+        self.assertEqual(2, failing.call_count)
+        self.assertEqual([], results)
+
+    def test_flush_reports_after_shutdown(self):
+        self.plugin.executor.shutdown()
+        self.plugin._pending_reports.append(('JIR-42', 'failed', self, 'late'))
+        self.assertRaises(RuntimeError, self.plugin.flush_reports)
+        # the semaphore is bounded, releasing it again fails unless the slot was leaked
+        self.assertRaises(ValueError, self.plugin._batches_in_flight.release)
+
+    def test_log_report_errors_once(self):
+        future = MagicMock()
+        future.result.return_value = ['error: no transition', None, 'error: forbidden']
+        self.plugin._batches_in_flight.acquire()
+        with self.assertLogs(self.plugin.logger, 'ERROR') as logs:
+            self.plugin._log_report(future)
+        self.assertEqual(1, len(logs.records))
+        self.assertIn('2 jira report(s) failed', logs.output[0])
+
+    def test_report_shared_issue(self):
+        self.plugin.reporting_batch_size = 3
+        for message in ('first', 'second', 'third'):
+            self.plugin.report(self, 'failed', 'JIR-42', message, None)
+        self.plugin.executor.shutdown()
+        self.assertFalse(self.plugin.jira_client.search_issues.called)
+        self.plugin.jira_client.issue.assert_called_once_with('JIR-42', 'status')
+
+    def test_dump_regressions(self):
+        self.plugin.regressions = [JiraRegression('10042', self, 'a failure'), JiraRegression('10043', self, 'other')]
+        rst_message = '.. sourcecode::\n\n    multi\n    line\n'
+        self.plugin.regressions.append(JiraRegression('10044', self, 'multi\nline'))
+        with TemporaryDirectory() as report_dir:
+            for extension, expected_header in (('md', '# 10042\n'), ('rst', '10042\n=====\n')):
+                self.plugin.regression_report_path = os.path.join(report_dir, 'jira_regression.' + extension)
+                getattr(self.plugin, 'dump_' + extension)()
+                with open(self.plugin.regression_report_path, encoding='utf-8') as regression_file:
+                    content = regression_file.read()
+                self.assertIn(expected_header, content)
+                self.assertIn('a failure', content)
+                self.assertIn('10043', content)
+                self.assertIn('Regression was found by `{}`'.format(self), content)
+                if extension == 'rst':
+                    self.assertIn(rst_message, content)